@@ -1,11 +1,17 @@
 
+import atexit
 import json
 import os
+import sys
+import time
 from collections import deque
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
 class Book:
     """Represents a physical book in our inventory"""
+    __slots__ = ('title', 'author', 'isbn', 'is_available', 'waitlist',
+                 'due_date', 'checkout_history')
+
     def __init__(self, title, author, isbn):
         self.title = title.strip().title()
         self.author = author.strip().title()
@@ -32,12 +38,21 @@ class Book:
         }
 
 class Library:
-    """Core system class handling all library operations"""
+    """Core system class handling all library operations
+
+    Holds the activity log open and may defer saves, so call close()
+    when done, or use it as a context manager: ``with Library() as lib:``
+    """
     
-    def __init__(self):
+    def __init__(self, pretty=False):
         self.books = {}  # ISBN -> Book mapping (our hash map)
         self.log_file = "library_activity.log"
+        self._log_fh = open(self.log_file, 'a', buffering=1)  # line buffered
         self.data_file = "library_inventory.json"
+        self.save_interval = 2.0  # seconds between automatic saves
+        self.pretty = pretty  # indented JSON, handy when debugging
+        self._dirty = False
+        self._last_save = time.monotonic()
         self.load_data()
         self.current_date = datetime.now().date()
         
@@ -47,14 +62,14 @@ class Library:
         try:
             if os.path.exists(self.data_file):
                 with open(self.data_file, 'r') as f:
-                    data = json.load(f)
+                    data = json.loads(f.read())
                     for isbn, book_data in data.items():
                         book = Book(book_data['title'], 
                                   book_data['author'], 
                                   isbn)
                         book.is_available = book_data['is_available']
                         book.waitlist = deque(book_data.get('waitlist', []))
-                        book.due_date = datetime.strptime(book_data['due_date'], '%Y-%m-%d').date() if book_data['due_date'] else None
+                        book.due_date = date.fromisoformat(book_data['due_date']) if book_data['due_date'] else None
                         book.checkout_history = book_data.get('checkout_history', [])
                         self.books[isbn] = book
             self.log("System initialized - data loaded")
@@ -65,21 +80,66 @@ class Library:
         """Save current state to file"""
         try:
             data = {isbn: book.to_dict() for isbn, book in self.books.items()}
+            if self.pretty:
+                payload = json.dumps(data, indent=2)
+            else:
+                payload = json.dumps(data, separators=(',', ':'))
             with open(self.data_file, 'w') as f:
-                json.dump(data, f, indent=2)
+                f.write(payload)
+            self._dirty = False
+            self._last_save = time.monotonic()
             return True
         except Exception as e:
             self.log(f"Error saving data: {str(e)}", error=True)
             return False
 
+    def _maybe_flush(self):
+        """Mark state as changed and save only if the last save is old enough
+
+        The throttle only helps programmatic bulk callers; the CLI flushes
+        before every prompt anyway.
+        """
+        self._dirty = True
+        # After close() nothing will flush later, so save right away
+        if (self._log_fh.closed or
+                time.monotonic() - self._last_save > self.save_interval):
+            self.save_data()
+
+    def flush(self):
+        """Write pending changes to file, if there are any"""
+        if not self._dirty:
+            return True
+        return self.save_data()
+
+    def close(self):
+        """Save pending changes and release the log file (required)
+
+        The instance stays usable afterwards, but each later log entry
+        and change is written immediately.
+        """
+        if self._log_fh.closed:
+            return
+        self.flush()
+        self._log_fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
     def log(self, message, error=False):
         """Record system activity and errors"""
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         log_type = "ERROR" if error else "INFO"
         entry = f"[{timestamp}] {log_type}: {message}\n"
         
-        with open(self.log_file, 'a') as f:
-            f.write(entry)
+        if self._log_fh.closed:
+            # Used after close(): fall back to a one-off append
+            with open(self.log_file, 'a') as f:
+                f.write(entry)
+        else:
+            self._log_fh.write(entry)
         
         if error:
             print(f"! System Error: {message}")
@@ -98,22 +158,21 @@ class Library:
         new_book = Book(title, author, isbn)
         self.books[isbn] = new_book
         self.log(f"Added new book: {title} by {author} (ISBN: {isbn})")
-        self.save_data()
+        self._maybe_flush()
         print(f"Successfully added '{title}' to the collection")
         return True
 
     def checkout_book(self, isbn, member_id, days=14):
         """Check out a book to a patron"""
-        if isbn not in self.books:
+        book = self.books.get(isbn)
+        if book is None:
             print("Error: Book not found in our system")
             return False
-            
-        book = self.books[isbn]
         
         if not book.is_available:
             if member_id not in book.waitlist:
                 book.waitlist.append(member_id)
-                self.save_data()
+                self._maybe_flush()
                 print(f"Book is currently checked out. You're #{len(book.waitlist)} in line.")
                 self.log(f"Added {member_id} to waitlist for {book.title}")
             else:
@@ -127,18 +186,17 @@ class Library:
             'checkout_date': self.current_date.isoformat(),
             'due_date': book.due_date.isoformat()
         })
-        self.save_data()
+        self._maybe_flush()
         self.log(f"{member_id} checked out {book.title} (Due: {book.due_date})")
         print(f"Successfully checked out '{book.title}'. Due: {book.due_date}")
         return True
 
     def return_book(self, isbn):
         """Process a book return"""
-        if isbn not in self.books:
+        book = self.books.get(isbn)
+        if book is None:
             print("Error: Invalid ISBN - not in our records")
             return False
-            
-        book = self.books[isbn]
         
         if book.is_available:
             print("Error: This book wasn't checked out")
@@ -157,7 +215,7 @@ class Library:
             self.log(f"Notifying {next_member} that {book.title} is available")
             print(f"Notified member {next_member} that book is now available")
         
-        self.save_data()
+        self._maybe_flush()
         self.log(f"Book returned: {book.title}" + 
                 (f" (Late by {late_days} days)" if is_late else ""))
         
@@ -208,51 +266,71 @@ def get_input(prompt, required=True):
             continue
         return user_input
 
+def add_book_menu(library):
+    """Prompt for book details and add it"""
+    print("\nADD NEW BOOK")
+    title = get_input("Title: ")
+    author = get_input("Author: ")
+    isbn = get_input("ISBN: ")
+    library.add_book(title, author, isbn)
+
+def checkout_book_menu(library):
+    """Prompt for ISBN and member, then check out"""
+    print("\nCHECK OUT BOOK")
+    isbn = get_input("Enter book ISBN: ")
+    member_id = get_input("Enter your member ID: ")
+    library.checkout_book(isbn, member_id)
+
+def return_book_menu(library):
+    """Prompt for ISBN and process the return"""
+    print("\nRETURN BOOK")
+    isbn = get_input("Enter book ISBN: ")
+    library.return_book(isbn)
+
+def search_books_menu(library):
+    """Prompt for a search term and show matches"""
+    print("\nSEARCH BOOKS")
+    search_term = get_input("Enter title, author or ISBN: ")
+    library.search_books(search_term)
+
+def view_books_menu(library):
+    """List every book in the collection"""
+    print("\nALL BOOKS IN COLLECTION:")
+    for book in library.books.values():
+        print(f"- {book}")
+
+# Menu choice -> handler; '6' (exit) is handled by the main loop
+MENU_ACTIONS = {
+    '1': add_book_menu,
+    '2': checkout_book_menu,
+    '3': return_book_menu,
+    '4': search_books_menu,
+    '5': view_books_menu,
+}
+
 def main():
     """Main program loop"""
     print("\nWelcome to the Library Management System!")
-    library = Library()
+    library = Library(pretty='--pretty' in sys.argv[1:])
+    atexit.register(library.close)  # don't lose pending changes on Ctrl+C
     
     while True:
+        # Write anything pending before blocking on the next prompt
+        library.flush()
         print_menu()
         choice = get_input("Enter your choice (1-6): ")
         
-        try:
-            if choice == '1':
-                print("\nADD NEW BOOK")
-                title = get_input("Title: ")
-                author = get_input("Author: ")
-                isbn = get_input("ISBN: ")
-                library.add_book(title, author, isbn)
-            
-            elif choice == '2':
-                print("\nCHECK OUT BOOK")
-                isbn = get_input("Enter book ISBN: ")
-                member_id = get_input("Enter your member ID: ")
-                library.checkout_book(isbn, member_id)
-            
-            elif choice == '3':
-                print("\nRETURN BOOK")
-                isbn = get_input("Enter book ISBN: ")
-                library.return_book(isbn)
-            
-            elif choice == '4':
-                print("\nSEARCH BOOKS")
-                search_term = get_input("Enter title, author or ISBN: ")
-                library.search_books(search_term)
-            
-            elif choice == '5':
-                print("\nALL BOOKS IN COLLECTION:")
-                for book in library.books.values():
-                    print(f"- {book}")
-            
-            elif choice == '6':
-                print("\nThank you for using the Library System!")
-                break
-            
-            else:
-                print("Invalid choice. Please enter 1-6")
+        if choice == '6':
+            print("\nThank you for using the Library System!")
+            break
         
+        action = MENU_ACTIONS.get(choice)
+        if action is None:
+            print("Invalid choice. Please enter 1-6")
+            continue
+        
+        try:
+            action(library)
         except Exception as e:
             library.log(f"Unexpected error: {str(e)}", error=True)
             print("An error occurred. Please try again.")